@@ -9,18 +9,40 @@ Uso:
     python analisis.py              # Genera todos los gráficos
     python analisis.py --stats      # Muestra estadísticas sin gráficos
     python analisis.py --export     # Exporta resumen a CSV
+    python analisis.py --no-show    # Guarda los gráficos sin abrir ventanas
 """
 
+import csv
+import numpy as np
 import pandas as pd
 import os
 import sys
+import warnings
 from datetime import datetime, timedelta
 from typing import Optional
 
+# Sin pantalla disponible (o con --no-show) solo se guardan los PNG
+SHOW_PLOTS = '--no-show' not in sys.argv and not (
+    sys.platform.startswith('linux')
+    and not os.environ.get('DISPLAY')
+    and not os.environ.get('WAYLAND_DISPLAY')
+)
+
 # Intentar importar matplotlib (opcional para gráficos)
 try:
+    import matplotlib
+    if not SHOW_PLOTS:
+        # Evita inicializar un backend GUI (Qt/Tk) que no se va a usar
+        matplotlib.use('Agg')
     import matplotlib.pyplot as plt
     import matplotlib.dates as mdates
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+    from matplotlib.ticker import StrMethodFormatter
+    plt.rcParams['path.simplify'] = True
+    plt.rcParams['path.simplify_threshold'] = 1.0
+    # Separador de miles para los ejes de votos (una instancia compartida)
+    THOUSANDS_FMT = StrMethodFormatter('{x:,.0f}')
     MATPLOTLIB_AVAILABLE = True
 except ImportError:
     MATPLOTLIB_AVAILABLE = False
@@ -31,6 +53,22 @@ HISTORICAL_DIR = "historical_data"
 DEPT_FILE = os.path.join(HISTORICAL_DIR, "projection_data_per_department.csv")
 MUN_FILE = os.path.join(HISTORICAL_DIR, "projection_data_per_municipality.csv")
 
+# Los porcentajes se guardan con dos decimales: float32 es suficiente
+PCT_COLUMNS = ['avg_actas_pct'] + [f'porcentaje_{i}' for i in range(1, 4)]
+
+# Series más largas que esto se reducen con LTTB antes de graficar
+LTTB_MIN_POINTS = 1000
+LTTB_POINTS = 500
+
+# Por encima de esta cantidad de muestras las líneas se dibujan sin marcadores
+MARKER_MAX_POINTS = 200
+
+# Figura del dashboard reutilizada entre llamadas con reuse=True
+_DASH_CACHE = {}
+
+# Huella (muestras, último timestamp) de los datos de la última salida generada
+_LAST_FP = {}
+
 
 def load_historical_data(file_path: str) -> Optional[pd.DataFrame]:
     """Carga los datos históricos desde el CSV especificado."""
@@ -39,48 +77,156 @@ def load_historical_data(file_path: str) -> Optional[pd.DataFrame]:
         print("   Ejecuta main.py para recopilar datos primero.")
         return None
     
-    df = pd.read_csv(file_path)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    try:
+        # Lector multihilo de PyArrow: parsea el CSV y los timestamps en una pasada
+        df = pd.read_csv(file_path, engine='pyarrow', parse_dates=['timestamp'])
+    except ImportError:
+        # Sin pyarrow: parser en C sobre el archivo mapeado en memoria
+        df = pd.read_csv(file_path, engine='c', memory_map=True)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    
+    for col in PCT_COLUMNS:
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_numeric_dtype(df[col]):
+            # CSV escrito por main.py: el tipo ya es numérico, basta un cast en C
+            df[col] = df[col].astype('float32')
+        else:
+            # Celdas corruptas: coerción solo cuando hace falta; quedan como NaN, igual que las vacías
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
     return df
 
 
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int = LTTB_POINTS) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: devuelve los índices de los `n_out` puntos
+    que mejor preservan la forma visual de la serie (x, y).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # n_out - 2 cubetas entre el primer y el último punto, que siempre se conservan
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        next_end = edges[b + 2] if b + 2 < len(edges) else n
+        # Vértice C: promedio de la cubeta siguiente
+        cx = x[end:next_end].mean()
+        cy = y[end:next_end].mean()
+        # Área (x2) del triángulo A-B-C para todos los candidatos B de la cubeta
+        area = np.abs((x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        selected[b + 1] = a
+    
+    return selected
+
+
+def _downsample(ts_num: np.ndarray, y: np.ndarray):
+    """Reduce una serie temporal (fechas en ordinales de matplotlib) con LTTB si es demasiado larga."""
+    if len(ts_num) < LTTB_MIN_POINTS:
+        return ts_num, y
+    idx = lttb(ts_num, np.asarray(y, dtype=np.float64))
+    return ts_num[idx], y[idx]
+
+
+def _add_candidate_lines(ax, ts_num: np.ndarray, series: np.ndarray, labels: list, colors: list,
+                         lc: Optional["LineCollection"] = None) -> "LineCollection":
+    """
+    Dibuja las series de los candidatos en una sola LineCollection con su leyenda.
+    Si se pasa `lc`, actualiza sus segmentos en lugar de crear un artista nuevo.
+    """
+    shown = [k for k, label in enumerate(labels) if label]
+    segments = [np.column_stack(_downsample(ts_num, series[k])) for k in shown]
+    line_colors = [colors[k] for k in shown]
+    if lc is None:
+        lc = LineCollection(segments, colors=line_colors, linewidths=2)
+        ax.add_collection(lc)
+    else:
+        lc.set_segments(segments)
+        lc.set_color(line_colors)
+        ax.ignore_existing_data_limits = True
+        if segments:
+            ax.update_datalim(np.concatenate(segments))
+    ax.autoscale_view()
+    handles = [Line2D([], [], color=colors[k], linewidth=2) for k in shown]
+    # loc='best' ignora los segmentos de una LineCollection. Los votos son acumulativos
+    # y los porcentajes se grafican sobre 0-100: la esquina superior izquierda queda libre
+    ax.legend(handles, [labels[k] for k in shown], loc='upper left', fontsize=8)
+    return lc
+
+
+def _marker_style(n_points: int) -> dict:
+    """Marcadores solo para series cortas; en series densas Agg dibuja un único trazo."""
+    if n_points <= MARKER_MAX_POINTS:
+        return {'marker': 'o', 'markersize': 3}
+    return {'marker': None}
+
+
+def _data_fingerprint(df: pd.DataFrame) -> tuple:
+    """Huella barata de los datos: cantidad de muestras y último timestamp."""
+    return len(df), df['timestamp'].iat[-1]
+
+
+def _column_summary(a: np.ndarray):
+    """Mínimo, máximo, primer y último valor de cada columna de un bloque (N, k)."""
+    # Como pandas: se ignoran los NaN y una columna toda vacía da NaN sin advertencia
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmin(a, axis=0), np.nanmax(a, axis=0), a[0], a[-1]
+
+
 def show_statistics(df: pd.DataFrame) -> None:
     """Muestra estadísticas básicas de los datos recopilados."""
     print("\n" + "="*60)
     print("📊 ESTADÍSTICAS DE DATOS HISTÓRICOS")
     print("="*60)
     
+    last_row = df.iloc[-1]
+    candidatos = [last_row.get(f'candidato_{i}', '') for i in range(1, 4)]
+    
+    # Una sola lectura por bloque de columnas en lugar de un .get por valor
+    vote_cols = [f'votos_actuales_{i}' for i in range(1, 4)] + [f'votos_proyectados_{i}' for i in range(1, 4)]
+    votos_actuales, votos_proyectados = df[vote_cols].iloc[-1].to_numpy().reshape(2, 3)
+    
+    # Todas las reducciones de actas y porcentajes sobre un único bloque contiguo
+    stat_cols = ['avg_actas_pct'] + [f'porcentaje_{i}' for i in range(1, 4)]
+    col_min, col_max, col_first, col_last = _column_summary(df[stat_cols].to_numpy(np.float32))
+    pct_inicial, pct_final = col_first[1:], col_last[1:]
+    
+    inicio, fin = df['timestamp'].min(), df['timestamp'].max()
+    
     # Información general
     print(f"\n📅 Período de recopilación:")
-    print(f"   Inicio: {df['timestamp'].min().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"   Fin:    {df['timestamp'].max().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"   Inicio: {inicio.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"   Fin:    {fin.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    duration = df['timestamp'].max() - df['timestamp'].min()
+    duration = fin - inicio
     print(f"   Duración: {duration}")
     
     print(f"\n📈 Total de muestras: {len(df)}")
     
     # Progreso de actas
     print(f"\n📋 Progreso de actas escrutadas:")
-    print(f"   Mínimo: {df['avg_actas_pct'].min():.2f}%")
-    print(f"   Máximo: {df['avg_actas_pct'].max():.2f}%")
-    print(f"   Actual: {df['avg_actas_pct'].iloc[-1]:.2f}%")
+    print(f"   Mínimo: {col_min[0]:.2f}%")
+    print(f"   Máximo: {col_max[0]:.2f}%")
+    print(f"   Actual: {col_last[0]:.2f}%")
     
     # Resultados por candidato
     print("\n🗳️ RESULTADOS ACTUALES (última medición):")
     print("-"*50)
     
-    last_row = df.iloc[-1]
-    for i in range(1, 4):
-        candidato = last_row.get(f'candidato_{i}', '')
+    for i, candidato in enumerate(candidatos, 1):
         if candidato:
-            votos_actual = last_row.get(f'votos_actuales_{i}', 0)
-            votos_proy = last_row.get(f'votos_proyectados_{i}', 0)
-            porcentaje = last_row.get(f'porcentaje_{i}', 0)
             print(f"   {i}. {candidato}")
-            print(f"      Votos actuales:    {int(votos_actual):,}")
-            print(f"      Votos proyectados: {int(votos_proy):,}")
-            print(f"      Porcentaje:        {porcentaje:.2f}%")
+            print(f"      Votos actuales:    {int(votos_actuales[i-1]):,}")
+            print(f"      Votos proyectados: {int(votos_proyectados[i-1]):,}")
+            print(f"      Porcentaje:        {pct_final[i-1]:.2f}%")
             print()
     
     # Tendencias
@@ -88,13 +234,9 @@ def show_statistics(df: pd.DataFrame) -> None:
         print("📉 TENDENCIAS (cambio desde primera medición):")
         print("-"*50)
         
-        first_row = df.iloc[0]
-        for i in range(1, 4):
-            candidato = last_row.get(f'candidato_{i}', '')
+        cambios = pct_final - pct_inicial
+        for candidato, cambio in zip(candidatos, cambios):
             if candidato:
-                pct_inicial = first_row.get(f'porcentaje_{i}', 0)
-                pct_final = last_row.get(f'porcentaje_{i}', 0)
-                cambio = pct_final - pct_inicial
                 emoji = "📈" if cambio > 0 else "📉" if cambio < 0 else "➡️"
                 print(f"   {emoji} {candidato}: {cambio:+.2f}%")
 
@@ -105,15 +247,20 @@ def plot_vote_trends(df: pd.DataFrame) -> None:
         print("❌ matplotlib no disponible para generar gráficos")
         return
     
+    last_row = df.iloc[-1]
+    # Convertir las fechas a ordinales una sola vez en lugar de en cada ax.plot
+    ts_num = mdates.date2num(df['timestamp'].to_numpy())
+    marker_kw = _marker_style(len(df))
+    
     fig, ax = plt.subplots(figsize=(12, 6))
     
     colors = ['#003893', '#DC143C', '#228B22']  # Azul, Rojo, Verde
     
     for i in range(1, 4):
-        candidato = df[f'candidato_{i}'].iloc[-1] if f'candidato_{i}' in df.columns else None
+        candidato = last_row.get(f'candidato_{i}')
         if candidato:
-            ax.plot(df['timestamp'], df[f'votos_proyectados_{i}'], 
-                   label=candidato, linewidth=2, color=colors[i-1], marker='o', markersize=3)
+            ax.plot(*_downsample(ts_num, df[f'votos_proyectados_{i}'].to_numpy()), 
+                   label=candidato, linewidth=2, color=colors[i-1], **marker_kw)
     
     ax.set_xlabel('Tiempo', fontsize=12)
     ax.set_ylabel('Votos Proyectados', fontsize=12)
@@ -122,16 +269,19 @@ def plot_vote_trends(df: pd.DataFrame) -> None:
     ax.grid(True, alpha=0.3)
     
     # Formatear eje X
+    ax.xaxis_date()
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
     plt.xticks(rotation=45)
     
     # Formatear números en eje Y con separadores de miles
-    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: format(int(x), ',')))
+    ax.yaxis.set_major_formatter(THOUSANDS_FMT)
     
     plt.tight_layout()
     plt.savefig('grafico_votos.png', dpi=150)
     print("✅ Gráfico guardado: grafico_votos.png")
-    plt.show()
+    if SHOW_PLOTS:
+        plt.show()
+    plt.close(fig)
 
 
 def plot_percentage_trends(df: pd.DataFrame) -> None:
@@ -140,15 +290,20 @@ def plot_percentage_trends(df: pd.DataFrame) -> None:
         print("❌ matplotlib no disponible para generar gráficos")
         return
     
+    last_row = df.iloc[-1]
+    # Convertir las fechas a ordinales una sola vez en lugar de en cada ax.plot
+    ts_num = mdates.date2num(df['timestamp'].to_numpy())
+    marker_kw = _marker_style(len(df))
+    
     fig, ax = plt.subplots(figsize=(12, 6))
     
     colors = ['#003893', '#DC143C', '#228B22']
     
     for i in range(1, 4):
-        candidato = df[f'candidato_{i}'].iloc[-1] if f'candidato_{i}' in df.columns else None
+        candidato = last_row.get(f'candidato_{i}')
         if candidato:
-            ax.plot(df['timestamp'], df[f'porcentaje_{i}'], 
-                   label=candidato, linewidth=2, color=colors[i-1], marker='o', markersize=3)
+            ax.plot(*_downsample(ts_num, df[f'porcentaje_{i}'].to_numpy()), 
+                   label=candidato, linewidth=2, color=colors[i-1], **marker_kw)
     
     ax.set_xlabel('Tiempo', fontsize=12)
     ax.set_ylabel('Porcentaje (%)', fontsize=12)
@@ -158,13 +313,16 @@ def plot_percentage_trends(df: pd.DataFrame) -> None:
     ax.set_ylim(0, 100)
     
     # Formatear eje X
+    ax.xaxis_date()
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
     plt.xticks(rotation=45)
     
     plt.tight_layout()
     plt.savefig('grafico_porcentajes.png', dpi=150)
     print("✅ Gráfico guardado: grafico_porcentajes.png")
-    plt.show()
+    if SHOW_PLOTS:
+        plt.show()
+    plt.close(fig)
 
 
 def plot_actas_progress(df: pd.DataFrame) -> None:
@@ -173,10 +331,14 @@ def plot_actas_progress(df: pd.DataFrame) -> None:
         print("❌ matplotlib no disponible para generar gráficos")
         return
     
+    ts_num = mdates.date2num(df['timestamp'].to_numpy())
+    actas_ts, actas = _downsample(ts_num, df['avg_actas_pct'].to_numpy())
+    marker_kw = _marker_style(len(df))
+    
     fig, ax = plt.subplots(figsize=(12, 4))
     
-    ax.fill_between(df['timestamp'], df['avg_actas_pct'], alpha=0.3, color='green')
-    ax.plot(df['timestamp'], df['avg_actas_pct'], linewidth=2, color='green', marker='o', markersize=3)
+    ax.fill_between(actas_ts, actas, alpha=0.3, color='green')
+    ax.plot(actas_ts, actas, linewidth=2, color='green', **marker_kw)
     
     ax.set_xlabel('Tiempo', fontsize=12)
     ax.set_ylabel('Porcentaje de Actas (%)', fontsize=12)
@@ -185,105 +347,153 @@ def plot_actas_progress(df: pd.DataFrame) -> None:
     ax.set_ylim(0, 100)
     
     # Formatear eje X
+    ax.xaxis_date()
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
     plt.xticks(rotation=45)
     
     plt.tight_layout()
     plt.savefig('grafico_actas.png', dpi=150)
     print("✅ Gráfico guardado: grafico_actas.png")
-    plt.show()
+    if SHOW_PLOTS:
+        plt.show()
+    plt.close(fig)
 
 
-def plot_combined_dashboard(df: pd.DataFrame) -> None:
-    """Genera un dashboard combinado con todos los gráficos."""
+def plot_combined_dashboard(df: pd.DataFrame, reuse: bool = False) -> None:
+    """
+    Genera un dashboard combinado con todos los gráficos.
+    Con reuse=True (p. ej. al regenerarlo en un ciclo) la figura se conserva entre
+    llamadas y solo se actualizan los datos de sus artistas; en ese modo no se muestra.
+    """
     if not MATPLOTLIB_AVAILABLE:
         print("❌ matplotlib no disponible para generar gráficos")
         return
     
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    fp = _data_fingerprint(df)
+    if _LAST_FP.get('dashboard') == fp:
+        print("ℹ️  Sin datos nuevos: dashboard_electoral.png ya está actualizado")
+        return
+    
+    last_row = df.iloc[-1]
+    # Convertir las fechas a ordinales una sola vez para todos los paneles
+    ts_num = mdates.date2num(df['timestamp'].to_numpy())
+    actas_ts, actas = _downsample(ts_num, df['avg_actas_pct'].to_numpy())
+    
+    # Extraer cada serie una sola vez en bloques (candidato, tiempo) contiguos
+    va = np.stack([df[f'votos_actuales_{i}'].to_numpy(np.float32) for i in range(1, 4)])
+    vp = np.stack([df[f'votos_proyectados_{i}'].to_numpy(np.float32) for i in range(1, 4)])
+    pct = np.stack([df[f'porcentaje_{i}'].to_numpy(np.float32) for i in range(1, 4)])
     
     colors = ['#003893', '#DC143C', '#228B22']
+    candidatos = [last_row.get(f'candidato_{i}') for i in range(1, 4)]
+    
+    cache = _DASH_CACHE.get('dashboard') if reuse else None
+    if cache is not None:
+        # Actualizar los artistas existentes en lugar de reconstruir la figura
+        fig, axes, lines = cache['fig'], cache['axes'], cache['lines']
+        for ax, key, series in ((axes[0, 0], 'vp', vp), (axes[0, 1], 'pct', pct), (axes[1, 1], 'va', va)):
+            _add_candidate_lines(ax, ts_num, series, candidatos, colors, lc=lines[key])
+        # Polígono de fill_between: la curva de actas y de vuelta sobre el eje X
+        cache['actas_fill'].set_verts([np.column_stack([
+            np.concatenate([actas_ts, actas_ts[::-1]]),
+            np.concatenate([actas, np.zeros_like(actas)]),
+        ])])
+        cache['actas_line'].set_data(actas_ts, actas)
+        axes[1, 0].relim()
+        axes[1, 0].autoscale_view()
+    else:
+        fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+        lines = {}
+        
+        # Gráfico 1: Votos proyectados
+        ax1 = axes[0, 0]
+        lines['vp'] = _add_candidate_lines(ax1, ts_num, vp, candidatos, colors)
+        ax1.set_title('Votos Proyectados', fontweight='bold')
+        ax1.grid(True, alpha=0.3)
+        ax1.yaxis.set_major_formatter(THOUSANDS_FMT)
+        
+        # Gráfico 2: Porcentajes
+        ax2 = axes[0, 1]
+        lines['pct'] = _add_candidate_lines(ax2, ts_num, pct, candidatos, colors)
+        ax2.set_title('Porcentajes', fontweight='bold')
+        ax2.grid(True, alpha=0.3)
+        ax2.set_ylim(0, 100)
+        
+        # Gráfico 3: Progreso de actas
+        ax3 = axes[1, 0]
+        actas_fill = ax3.fill_between(actas_ts, actas, alpha=0.3, color='green')
+        actas_line, = ax3.plot(actas_ts, actas, linewidth=2, color='green')
+        ax3.set_title('Progreso de Actas Escrutadas', fontweight='bold')
+        ax3.grid(True, alpha=0.3)
+        ax3.set_ylim(0, 100)
+        
+        # Gráfico 4: Votos actuales
+        ax4 = axes[1, 1]
+        lines['va'] = _add_candidate_lines(ax4, ts_num, va, candidatos, colors)
+        ax4.set_title('Votos Actuales (sin proyección)', fontweight='bold')
+        ax4.grid(True, alpha=0.3)
+        ax4.yaxis.set_major_formatter(THOUSANDS_FMT)
+        
+        # Formatear ejes X
+        for ax in axes.flat:
+            ax.xaxis_date()
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+            ax.tick_params(axis='x', labelrotation=45)
+        
+        fig.suptitle('Dashboard Electoral - Honduras 2025', fontsize=16, fontweight='bold', y=1.02)
+        
+        if reuse:
+            _DASH_CACHE['dashboard'] = {'fig': fig, 'axes': axes, 'lines': lines,
+                                        'actas_fill': actas_fill, 'actas_line': actas_line}
     
-    # Gráfico 1: Votos proyectados
-    ax1 = axes[0, 0]
-    for i in range(1, 4):
-        candidato = df[f'candidato_{i}'].iloc[-1] if f'candidato_{i}' in df.columns else None
-        if candidato:
-            ax1.plot(df['timestamp'], df[f'votos_proyectados_{i}'], 
-                    label=candidato, linewidth=2, color=colors[i-1])
-    ax1.set_title('Votos Proyectados', fontweight='bold')
-    ax1.legend(loc='best', fontsize=8)
-    ax1.grid(True, alpha=0.3)
-    ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: format(int(x), ',')))
-    
-    # Gráfico 2: Porcentajes
-    ax2 = axes[0, 1]
-    for i in range(1, 4):
-        candidato = df[f'candidato_{i}'].iloc[-1] if f'candidato_{i}' in df.columns else None
-        if candidato:
-            ax2.plot(df['timestamp'], df[f'porcentaje_{i}'], 
-                    label=candidato, linewidth=2, color=colors[i-1])
-    ax2.set_title('Porcentajes', fontweight='bold')
-    ax2.legend(loc='best', fontsize=8)
-    ax2.grid(True, alpha=0.3)
-    ax2.set_ylim(0, 100)
-    
-    # Gráfico 3: Progreso de actas
-    ax3 = axes[1, 0]
-    ax3.fill_between(df['timestamp'], df['avg_actas_pct'], alpha=0.3, color='green')
-    ax3.plot(df['timestamp'], df['avg_actas_pct'], linewidth=2, color='green')
-    ax3.set_title('Progreso de Actas Escrutadas', fontweight='bold')
-    ax3.grid(True, alpha=0.3)
-    ax3.set_ylim(0, 100)
-    
-    # Gráfico 4: Votos actuales
-    ax4 = axes[1, 1]
-    for i in range(1, 4):
-        candidato = df[f'candidato_{i}'].iloc[-1] if f'candidato_{i}' in df.columns else None
-        if candidato:
-            ax4.plot(df['timestamp'], df[f'votos_actuales_{i}'], 
-                    label=candidato, linewidth=2, color=colors[i-1])
-    ax4.set_title('Votos Actuales (sin proyección)', fontweight='bold')
-    ax4.legend(loc='best', fontsize=8)
-    ax4.grid(True, alpha=0.3)
-    ax4.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: format(int(x), ',')))
-    
-    # Formatear ejes X
-    for ax in axes.flat:
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-        for label in ax.get_xticklabels():
-            label.set_rotation(45)
-    
-    plt.suptitle('Dashboard Electoral - Honduras 2025', fontsize=16, fontweight='bold', y=1.02)
-    plt.tight_layout()
-    plt.savefig('dashboard_electoral.png', dpi=150, bbox_inches='tight')
+    fig.tight_layout()
+    fig.savefig('dashboard_electoral.png', dpi=150, bbox_inches='tight')
     print("✅ Dashboard guardado: dashboard_electoral.png")
-    plt.show()
+    _LAST_FP['dashboard'] = fp
+    if reuse:
+        # La figura queda en caché para la próxima llamada
+        return
+    if SHOW_PLOTS:
+        plt.show()
+    plt.close(fig)
 
 
 def export_summary(df: pd.DataFrame) -> None:
     """Exporta un resumen de los datos a un nuevo CSV."""
+    fp = _data_fingerprint(df)
+    if _LAST_FP.get('summary') == fp:
+        print("ℹ️  Sin datos nuevos: el último resumen exportado sigue vigente")
+        return
+    
     summary_file = f"resumen_electoral_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     
-    # Crear resumen
-    summary_data = []
+    last_row = df.iloc[-1]
+    first_row = df.iloc[0]
     
+    # Crear resumen: tres filas de esquema fijo, se escriben directamente sin DataFrame
+    rows = []
     for i in range(1, 4):
-        candidato = df[f'candidato_{i}'].iloc[-1] if f'candidato_{i}' in df.columns else None
+        candidato = last_row.get(f'candidato_{i}')
         if candidato:
-            summary_data.append({
-                'Candidato': candidato,
-                'Votos Actuales': int(df[f'votos_actuales_{i}'].iloc[-1]),
-                'Votos Proyectados': int(df[f'votos_proyectados_{i}'].iloc[-1]),
-                'Porcentaje': df[f'porcentaje_{i}'].iloc[-1],
-                'Porcentaje Inicial': df[f'porcentaje_{i}'].iloc[0],
-                'Cambio (%)': df[f'porcentaje_{i}'].iloc[-1] - df[f'porcentaje_{i}'].iloc[0],
-                'Muestras': len(df)
-            })
-    
-    summary_df = pd.DataFrame(summary_data)
-    summary_df.to_csv(summary_file, index=False, encoding='utf-8')
+            pct_final = last_row[f'porcentaje_{i}']
+            pct_inicial = first_row[f'porcentaje_{i}']
+            rows.append([
+                candidato,
+                int(last_row[f'votos_actuales_{i}']),
+                int(last_row[f'votos_proyectados_{i}']),
+                f"{pct_final:.2f}",
+                f"{pct_inicial:.2f}",
+                f"{pct_final - pct_inicial:.2f}",
+                len(df),
+            ])
+    
+    with open(summary_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Candidato', 'Votos Actuales', 'Votos Proyectados', 'Porcentaje',
+                         'Porcentaje Inicial', 'Cambio (%)', 'Muestras'])
+        writer.writerows(rows)
     print(f"✅ Resumen exportado: {summary_file}")
+    _LAST_FP['summary'] = fp
 
 
 def main():
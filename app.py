@@ -4,14 +4,24 @@ Muestra proyecciones electorales con actualización automática.
 """
 
 import streamlit as st
-import pandas as pd
 import json
 import os
-import subprocess
-import sys
+import re
+import functools
+import heapq
+import mmap
+import sqlite3
+import threading
 from datetime import datetime
 import time
 
+# orjson es opcional: si no está instalado se usa el json de la biblioteca estándar
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configuración de la página
 st.set_page_config(
     page_title="Elecciones Honduras 2025 - Proyecciones",
@@ -23,39 +33,134 @@ st.set_page_config(
 # Constantes
 CACHE_FILE = "last_results.json"
 REFRESH_INTERVAL = 120  # segundos
-SCRAPER_RUNNING_FILE = ".scraper_running"
-DATA_UPDATED_FILE = ".data_updated"
+NEW_DATA_DEBOUNCE = 0.5  # segundos sin nuevas escrituras antes de recargar
+STATE_DB = "state.db"  # SQLite compartido con el scraper (main.py)
+# Meses en español sin depender del locale del sistema (setlocale es global al proceso)
+MESES = ('enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+         'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre')
+TIME_FMT = "%I:%M:%S %p"
+# Clasificación de los timestamps de entrada (ISO de main.py o "YYYY-MM-DD HH:MM:SS")
+_ISO_TS = re.compile(r'^\d{4}-\d{2}-\d{2}T')
+_NAIVE_TS = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+_SKIP_DEPTS = frozenset({'raw_data', 'Nacional'})  # entradas del payload que no son departamentos
+_QUALITY_SKIP_DEPTS = _SKIP_DEPTS | {'VOTO EN EL EXTERIOR'}  # no se revisan en check_data_quality
+_EXCLUDED = frozenset({"Información General", "Información Acta"})  # filas del CNE que no son candidatos
+# Cuenta regresiva del lado del cliente; la recarga la provoca _auto_refresh
+COUNTDOWN_HTML = """
+<div style="font-family: sans-serif; font-size: 14px; color: #31333f;">
+  ⏱️ Actualizando en <b id="c">{interval}</b> segundos... (actualización #{count})
+</div>
+<progress id="p" max="{interval}" value="0" style="width: 100%;"></progress>
+<script>
+  let r = {interval};
+  setInterval(() => {{
+    r = r > 1 ? r - 1 : {interval};
+    document.getElementById('c').innerText = r;
+    document.getElementById('p').value = {interval} - r;
+  }}, 1000);
+</script>
+"""
+
+def _open_state_db(check_same_thread: bool = True):
+    """Abrir la base de estado compartida (modo WAL) y asegurar que exista la tabla kv."""
+    conn = sqlite3.connect(STATE_DB, timeout=5, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT, version INTEGER NOT NULL DEFAULT 0)"
+    )
+    return conn
+
+def _get_state(key: str):
+    """Obtener (valor, versión) de una clave del estado compartido; (None, 0) si no existe."""
+    conn = _open_state_db()
+    try:
+        row = conn.execute("SELECT value, version FROM kv WHERE key = ?", (key,)).fetchone()
+    finally:
+        conn.close()
+    return row if row else (None, 0)
+
+@st.cache_resource
+def _state_conn():
+    """Conexión a state.db que dura lo que el proceso (compartida por todas las sesiones, con su lock)."""
+    return _open_state_db(check_same_thread=False), threading.Lock()
 
 def check_for_new_data():
-    """Verificar si el scraper ha escrito nuevos datos."""
-    if os.path.exists(DATA_UPDATED_FILE):
-        try:
-            os.remove(DATA_UPDATED_FILE)
-            return True
-        except:
-            pass
-    return False
+    """Verificar si el scraper ha escrito nuevos datos desde la última ejecución de esta sesión."""
+    conn, lock = _state_conn()
+    with lock:
+        # data_version solo cambia cuando otra conexión hace commit: si sigue igual no hace falta leer kv
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if 'last_seen_version' in st.session_state and st.session_state.get('last_seen_data_version') == data_version:
+            return False
+        row = conn.execute("SELECT version FROM kv WHERE key = 'data'").fetchone()
+    st.session_state.last_seen_data_version = data_version
+    
+    version = row[0] if row else 0
+    last_seen = st.session_state.get('last_seen_version')
+    st.session_state.last_seen_version = version
+    return last_seen is not None and version > last_seen
+
+@st.fragment(run_every=1)
+def _auto_refresh(interval: int):
+    """Tic de 1 s: solo este fragmento se re-ejecuta y recarga la app al haber datos nuevos o cumplirse el intervalo."""
+    now = time.monotonic()
+    if check_for_new_data():
+        # Agrupar escrituras seguidas del scraper: recargar cuando state.db lleve NEW_DATA_DEBOUNCE s sin cambios
+        st.session_state.new_data_at = now
+        return
+    new_data_at = st.session_state.get('new_data_at')
+    if new_data_at is not None and now - new_data_at >= NEW_DATA_DEBOUNCE:
+        st.rerun()
+    if now - st.session_state.get('last_full_run', 0.0) >= interval:
+        st.rerun()
 
 def is_scraper_running():
     """Verificar si el proceso del scraper está corriendo."""
-    return os.path.exists(SCRAPER_RUNNING_FILE)
+    value, _ = _get_state('scraper_running')
+    return value == '1'
 
 def trigger_scrape():
-    """Solicitar un nuevo scrape creando un archivo de trigger."""
-    trigger_file = ".trigger_scrape"
-    with open(trigger_file, 'w') as f:
-        f.write(datetime.now().isoformat())
+    """Solicitar un nuevo scrape incrementando la versión de 'trigger'."""
+    conn = _open_state_db()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO kv (key, value, version) VALUES ('trigger', ?, 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, version = kv.version + 1",
+                (datetime.now().isoformat(),),
+            )
+    finally:
+        conn.close()
     return True
 
+# cache_resource devuelve el mismo dict sin pickle (cache_data copiaría el payload en cada acierto);
+# nadie modifica el payload después de cargarlo
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _read_cache(mtime_ns: int, size: int) -> dict:
+    """Leer y decodificar el caché. (mtime_ns, size) solo sirven como clave de memoización."""
+    with open(CACHE_FILE, 'rb') as f:
+        if not ORJSON_AVAILABLE:
+            return json.loads(f.read())
+        # orjson acepta el buffer del mmap directamente: sin copia intermedia a bytes
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
 def load_cached_data():
-    """Cargar los datos más recientes del caché."""
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            st.error(f"Error cargando caché: {e}")
-    return None
+    """
+    Cargar los datos más recientes del caché (solo se re-decodifica si el archivo cambió).
+    Devuelve (data, payload_key); payload_key = (st_mtime_ns, st_size) identifica el payload
+    en las funciones con st.cache_data, que reciben el dict como `_data` para no hashearlo.
+    """
+    try:
+        stat = os.stat(CACHE_FILE)
+    except FileNotFoundError:
+        return None, None
+    payload_key = (stat.st_mtime_ns, stat.st_size)
+    try:
+        return _read_cache(*payload_key), payload_key
+    except Exception as e:
+        st.error(f"Error cargando caché: {e}")
+    return None, None
 
 def calculate_projection(current_votes: float, actas_percentage: float) -> float:
     """Calcular votos proyectados basado en el conteo actual y porcentaje de actas."""
@@ -63,86 +168,71 @@ def calculate_projection(current_votes: float, actas_percentage: float) -> float
         return current_votes
     return (current_votes * 100) / actas_percentage
 
-def generate_projection_summary(data, calculation_mode):
+def calculate_projections(current_votes, actas_percentage):
+    """Versión vectorizada de calculate_projection: opera sobre arreglos completos de NumPy (con broadcasting)."""
+    import numpy as np
+    
+    actas = np.asarray(actas_percentage, dtype=np.float64)
+    reported = actas > 0
+    return np.where(reported, np.multiply(current_votes, 100.0) / np.where(reported, actas, 1.0), current_votes)
+
+def _flatten(data, mode):
+    """Aplanar el payload en un DataFrame [name, votes, actas_pct] con una fila por candidato y unidad (depto o municipio)."""
+    import pandas as pd
+    
+    depts = [dept_data for dept_name, dept_data in data['departments'].items() if dept_name not in _SKIP_DEPTS]
+    if mode == 'DEPARTAMENTOS':
+        units = depts
+    elif mode == 'MUNICIPIOS':
+        units = [mun_data for dept_data in depts for mun_data in dept_data.get('municipios', {}).values()]
+    else:
+        units = []
+    
+    # Columnas paralelas; el % de actas se lee una vez por unidad, no por candidato
+    names, votes, actas = [], [], []
+    for unit in units:
+        candidates = unit.get('candidates', ())
+        names.extend([c.get('name', 'Desconocido') for c in candidates])
+        votes.extend([c.get('votes', 0) for c in candidates])
+        actas.extend([unit.get('actas_percentage', 0)] * len(candidates))
+    
+    df = pd.DataFrame({'name': names, 'votes': votes, 'actas_pct': actas})
+    return df[~df['name'].isin(_EXCLUDED)]
+
+@st.cache_data(show_spinner=False)
+def generate_projection_summary(payload_key, _data, calculation_mode):
     """
     Genera el resumen de proyección recalculando desde los datos crudos.
     calculation_mode: 'DEPARTAMENTOS' o 'MUNICIPIOS'
     """
-    if not data or 'departments' not in data:
+    if not _data or 'departments' not in _data:
         return []
-        
-    global_totals = {} # {name: {'current': 0, 'projected': 0}}
     
-    departments = data['departments']
+    df = _flatten(_data, calculation_mode)
+    if df.empty:
+        return []
     
-    for dept_name, dept_data in departments.items():
-        if dept_name in ('raw_data', 'Nacional'):
-            continue
-            
-        if calculation_mode == 'DEPARTAMENTOS':
-            actas_pct = dept_data.get('actas_percentage', 0)
-            candidates = dept_data.get('candidates', [])
-            
-            for cand in candidates:
-                name = cand.get('name', 'Desconocido')
-                votes = cand.get('votes', 0)
-                
-                if name in ["Información General", "Información Acta"]:
-                    continue
-                
-                if name not in global_totals:
-                    global_totals[name] = {'current': 0, 'projected': 0.0}
-                
-                global_totals[name]['current'] += votes
-                
-                proj = calculate_projection(votes, actas_pct)
-                global_totals[name]['projected'] += proj
-                
-        elif calculation_mode == 'MUNICIPIOS':
-            municipios = dept_data.get('municipios', {})
-            # Si no hay municipios (ej. Voto Exterior a veces), usar datos del depto si existen
-            if not municipios and calculation_mode == 'MUNICIPIOS':
-                 pass 
-
-            for mun_name, mun_data in municipios.items():
-                actas_pct = mun_data.get('actas_percentage', 0)
-                candidates = mun_data.get('candidates', [])
-                
-                for cand in candidates:
-                    name = cand.get('name', 'Desconocido')
-                    votes = cand.get('votes', 0)
-                    
-                    if name in ["Información General", "Información Acta"]:
-                        continue
-                    
-                    if name not in global_totals:
-                        global_totals[name] = {'current': 0, 'projected': 0.0}
-                    
-                    global_totals[name]['current'] += votes
-                    
-                    proj = calculate_projection(votes, actas_pct)
-                    global_totals[name]['projected'] += proj
-
-    # Calculate stats
-    results = []
-    grand_total_projected = sum(t['projected'] for t in global_totals.values())
+    # Proyección por unidad y suma por candidato en una sola pasada de pandas
+    df = df.assign(proj=calculate_projections(df['votes'].to_numpy(), df['actas_pct'].to_numpy()))
+    totals = df.groupby('name', sort=False)[['votes', 'proj']].sum()
+    grand_total_projected = totals['proj'].sum()
     
-    for name, totals in global_totals.items():
-        proj = totals['projected']
+    results = []
+    for row in totals.nlargest(3, 'proj').itertuples():
+        proj = float(row.proj)
         pct = (proj / grand_total_projected * 100) if grand_total_projected > 0 else 0
         results.append({
-            'Candidate': name,
-            'Current Votes': totals['current'],
+            'Candidate': row.Index,
+            'Current Votes': int(row.votes),
             'Projected Votes': proj,
             'Percentage': pct
         })
-        
-    # Sort by projected votes
-    results.sort(key=lambda x: x['Projected Votes'], reverse=True)
-    return results[:3]
+    return results
 
 def display_summary_metrics(summary_data, key_prefix=""):
     """Helper para mostrar las tarjetas de métricas."""
+    import pandas as pd
+    
     if not summary_data:
         st.warning("No hay datos suficientes para generar la proyección.")
         return
@@ -170,17 +260,28 @@ def display_summary_metrics(summary_data, key_prefix=""):
     except Exception as e:
         st.error(f"Error mostrando métricas: {str(e)}")
 
+@functools.lru_cache(maxsize=64)
 def format_timestamp(timestamp_str):
-    """Formatear timestamp para que sea más legible."""
-    try:
-        dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-        return dt.strftime("%d de %B, %Y a las %I:%M:%S %p")
-    except:
+    """Formatear timestamp para que sea más legible (el mismo cached_at se formatea en cada ejecución)."""
+    if not isinstance(timestamp_str, str):
+        return timestamp_str
+    if _ISO_TS.match(timestamp_str):
+        if timestamp_str.endswith('Z'):
+            timestamp_str = timestamp_str[:-1] + '+00:00'
         try:
-            dt = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-            return dt.strftime("%d de %B, %Y a las %I:%M:%S %p")
-        except:
+            dt = datetime.fromisoformat(timestamp_str)
+        except ValueError:
             return timestamp_str
+    elif _NAIVE_TS.match(timestamp_str):
+        dt = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
+    else:
+        return timestamp_str
+    return f"{dt.day:02d} de {MESES[dt.month - 1]}, {dt.year} a las {dt.strftime(TIME_FMT)}"
+
+@functools.lru_cache(maxsize=4)
+def _sorted_dept_names(keys: frozenset) -> tuple:
+    """Departamentos ordenados (sin _SKIP_DEPTS); los nombres no cambian entre recargas, así que se ordenan una vez."""
+    return tuple(sorted(keys - _SKIP_DEPTS))
 
 def check_data_quality(data):
     """Verificar si algún departamento (excepto VOTO EN EL EXTERIOR) tiene 0 votos."""
@@ -190,170 +291,184 @@ def check_data_quality(data):
     
     departments = data['departments']
     for dept_name, dept_data in departments.items():
-        if dept_name in ('raw_data', 'Nacional', 'VOTO EN EL EXTERIOR'):
+        if dept_name in _QUALITY_SKIP_DEPTS:
             continue
         
-        candidates = dept_data.get('candidates', [])
-        total_votes = sum(c.get('votes', 0) for c in candidates)
-        
-        if total_votes == 0:
+        # any() se detiene en el primer candidato con votos
+        if not any(c.get('votes', 0) for c in dept_data.get('candidates', ())):
             issues.append(dept_name)
     
     return issues
 
-def process_department_data(data):
-    """Procesar datos de departamentos en DataFrames para mostrar."""
-    if not data or 'departments' not in data:
-        return None, None
-    
-    departments = data['departments']
+@st.cache_data(show_spinner=False)
+def _top_candidates(payload_key, _data):
+    """Nombres de los 3 candidatos con más votos en el primer departamento con votos (columnas de las tablas)."""
+    if not _data or 'departments' not in _data:
+        return []
     
-    # Obtener nombres de candidatos del primer departamento con votos
-    top_candidates = []
+    departments = _data['departments']
     for dept_name, dept_data in departments.items():
-        if dept_name in ('raw_data', 'Nacional'):
+        if dept_name in _SKIP_DEPTS:
             continue
         candidates = dept_data.get('candidates', [])
         # Filter out non-candidates
-        candidates = [c for c in candidates if c.get('name') not in ["Información General", "Información Acta"]]
+        candidates = [c for c in candidates if c.get('name') not in _EXCLUDED]
         
         total_votes = sum(c.get('votes', 0) for c in candidates)
         if candidates and total_votes > 0:
-            sorted_cands = sorted(candidates, key=lambda x: x.get('votes', 0), reverse=True)
-            top_candidates = [c.get('name', 'Desconocido') for c in sorted_cands[:3]]
-            break
+            top_cands = heapq.nlargest(3, candidates, key=lambda x: x.get('votes', 0))
+            return [c.get('name', 'Desconocido') for c in top_cands]
+    return []
+
+@st.cache_data(show_spinner=False)
+def process_department_data(payload_key, _data, top_candidates=None, sorted_depts=None):
+    """Procesar datos de departamentos en DataFrames para mostrar."""
+    import numpy as np
+    import pandas as pd
+    
+    if not _data or 'departments' not in _data:
+        return None, None
+    
+    departments = _data['departments']
     
+    if top_candidates is None:
+        top_candidates = _top_candidates(payload_key, _data)
     if not top_candidates:
         return None, None
     
-    # Construir tabla de departamentos
-    dept_rows = []
-    totals = {c: {'current': 0, 'projected': 0.0} for c in top_candidates}
+    # Arreglos preasignados (uno por columna) en lugar de un dict por fila
+    dept_names = sorted_depts if sorted_depts is not None else _sorted_dept_names(frozenset(departments))
+    cand_index = {cand: j for j, cand in enumerate(top_candidates)}
+    n = len(dept_names)
+    actas = np.empty(n, dtype=np.float64)
+    votes = np.zeros((len(top_candidates), n), dtype=np.int64)
     
-    for dept_name in sorted(departments.keys()):
-        if dept_name in ('raw_data', 'Nacional'):
-            continue
-            
+    for i, dept_name in enumerate(dept_names):
         dept_data = departments[dept_name]
-        actas_pct = dept_data.get('actas_percentage', 0)
-        candidates = dept_data.get('candidates', [])
-        cand_votes = {c.get('name', 'Desconocido'): c.get('votes', 0) for c in candidates}
-        
-        row = {'Departamento': dept_name, 'Actas %': actas_pct}
-        
-        for cand in top_candidates:
-            votes = cand_votes.get(cand, 0)
-            
-            if actas_pct > 0:
-                raw_proj = calculate_projection(votes, actas_pct)
-                projected = int(round(raw_proj))
-                totals[cand]['projected'] += raw_proj
-            else:
-                projected = votes
-                totals[cand]['projected'] += float(votes)
-            
-            row[f'{cand[:15]} (Actual)'] = votes
-            row[f'{cand[:15]} (Proyectado)'] = projected
-            
-            totals[cand]['current'] += votes
-        
-        dept_rows.append(row)
-    
-    dept_df = pd.DataFrame(dept_rows)
+        actas[i] = dept_data.get('actas_percentage', 0)
+        for c in dept_data.get('candidates', ()):
+            j = cand_index.get(c.get('name', 'Desconocido'))
+            if j is not None:
+                votes[j, i] = c.get('votes', 0)
+    
+    # Proyección vectorizada: sin actas reportadas se mantienen los votos actuales
+    projected_raw = calculate_projections(votes, actas)
+    projected = np.rint(projected_raw).astype(np.int64)
+    
+    columns = {'Departamento': dept_names, 'Actas %': actas}
+    for j, cand in enumerate(top_candidates):
+        columns[f'{cand[:15]} (Actual)'] = votes[j]
+        columns[f'{cand[:15]} (Proyectado)'] = projected[j]
+    dept_df = pd.DataFrame(columns)
     
     # Construir fila de totales
+    vote_totals = votes.sum(axis=1)
+    projected_totals = projected_raw.sum(axis=1)
     total_row = {'Departamento': 'TOTAL', 'Actas %': ''}
-    for cand in top_candidates:
-        total_row[f'{cand[:15]} (Actual)'] = totals[cand]['current']
-        total_row[f'{cand[:15]} (Proyectado)'] = int(round(totals[cand]['projected']))
+    for j, cand in enumerate(top_candidates):
+        total_row[f'{cand[:15]} (Actual)'] = int(vote_totals[j])
+        total_row[f'{cand[:15]} (Proyectado)'] = int(round(projected_totals[j]))
     
     return dept_df, total_row
 
-def process_municipality_data(data):
+@st.cache_data(show_spinner=False)
+def process_municipality_data(payload_key, _data, top_candidates=None, sorted_depts=None):
     """Procesar datos de municipios en DataFrames para mostrar."""
-    if not data or 'departments' not in data:
-        return None, None
+    import numpy as np
+    import pandas as pd
     
-    departments = data['departments']
+    if not _data or 'departments' not in _data:
+        return None, None
     
-    # Obtener nombres de candidatos
-    top_candidates = []
-    for dept_name, dept_data in departments.items():
-        if dept_name in ('raw_data', 'Nacional'):
-            continue
-        candidates = dept_data.get('candidates', [])
-        # Filter out non-candidates
-        candidates = [c for c in candidates if c.get('name') not in ["Información General", "Información Acta"]]
-        
-        total_votes = sum(c.get('votes', 0) for c in candidates)
-        if candidates and total_votes > 0:
-            sorted_cands = sorted(candidates, key=lambda x: x.get('votes', 0), reverse=True)
-            top_candidates = [c.get('name', 'Desconocido') for c in sorted_cands[:3]]
-            break
+    departments = _data['departments']
     
+    if top_candidates is None:
+        top_candidates = _top_candidates(payload_key, _data)
     if not top_candidates:
         return None, None
         
-    mun_rows = []
-    totals = {c: {'current': 0, 'projected': 0.0} for c in top_candidates}
+    if sorted_depts is None:
+        sorted_depts = _sorted_dept_names(frozenset(departments))
     
-    for dept_name in sorted(departments.keys()):
-        if dept_name in ('raw_data', 'Nacional'):
-            continue
-            
-        dept_data = departments[dept_name]
-        municipios = dept_data.get('municipios', {})
-        
-        if not municipios:
-            continue
-            
-        for mun_name, mun_data in municipios.items():
-            actas_pct = mun_data.get('actas_percentage', 0)
-            candidates = mun_data.get('candidates', [])
-            cand_votes = {c.get('name', 'Desconocido'): c.get('votes', 0) for c in candidates}
-            
-            row = {
-                'Departamento': dept_name,
-                'Municipio': mun_name,
-                'Actas %': actas_pct
-            }
-            
-            for cand in top_candidates:
-                votes = cand_votes.get(cand, 0)
-                
-                if actas_pct > 0:
-                    raw_proj = calculate_projection(votes, actas_pct)
-                    projected = int(round(raw_proj))
-                    totals[cand]['projected'] += raw_proj
-                else:
-                    projected = votes
-                    totals[cand]['projected'] += float(votes)
-                
-                row[f'{cand[:15]} (Actual)'] = votes
-                row[f'{cand[:15]} (Proyectado)'] = projected
-                
-                totals[cand]['current'] += votes
-        
-        mun_rows.append(row)
-            
-    if not mun_rows:
+    # Una pasada para contar municipios y preasignar los arreglos (uno por columna)
+    n = sum(len(departments[dept_name].get('municipios', {})) for dept_name in sorted_depts)
+    if n == 0:
         return None, None
-
-    mun_df = pd.DataFrame(mun_rows)
+    
+    cand_index = {cand: j for j, cand in enumerate(top_candidates)}
+    row_depts = np.empty(n, dtype=object)
+    row_muns = np.empty(n, dtype=object)
+    actas = np.empty(n, dtype=np.float64)
+    votes = np.zeros((len(top_candidates), n), dtype=np.int64)
+    
+    i = 0
+    for dept_name in sorted_depts:
+        for mun_name, mun_data in departments[dept_name].get('municipios', {}).items():
+            row_depts[i] = dept_name
+            row_muns[i] = mun_name
+            actas[i] = mun_data.get('actas_percentage', 0)
+            # Votos de los candidatos principales, directo a su celda
+            for c in mun_data.get('candidates', ()):
+                j = cand_index.get(c.get('name', 'Desconocido'))
+                if j is not None:
+                    votes[j, i] = c.get('votes', 0)
+            i += 1
+    
+    # Proyección vectorizada: sin actas reportadas se mantienen los votos actuales
+    projected_raw = calculate_projections(votes, actas)
+    projected = np.rint(projected_raw).astype(np.int64)
+    
+    columns = {'Departamento': row_depts, 'Municipio': row_muns, 'Actas %': actas}
+    for j, cand in enumerate(top_candidates):
+        columns[f'{cand[:15]} (Actual)'] = votes[j]
+        columns[f'{cand[:15]} (Proyectado)'] = projected[j]
+    mun_df = pd.DataFrame(columns)
     
     # Construir fila de totales
+    vote_totals = votes.sum(axis=1)
+    projected_totals = projected_raw.sum(axis=1)
     total_row = {'Departamento': 'TOTAL', 'Municipio': '', 'Actas %': ''}
-    for cand in top_candidates:
-        total_row[f'{cand[:15]} (Actual)'] = totals[cand]['current']
-        total_row[f'{cand[:15]} (Proyectado)'] = int(round(totals[cand]['projected']))
+    for j, cand in enumerate(top_candidates):
+        total_row[f'{cand[:15]} (Actual)'] = int(vote_totals[j])
+        total_row[f'{cand[:15]} (Proyectado)'] = int(round(projected_totals[j]))
         
     return mun_df, total_row
 
-def format_number(x):
-    """Formatear números con comas."""
-    if isinstance(x, (int, float)) and not pd.isna(x):
-        return f"{int(x):,}"
-    return x
+def _styled_tables(df, total_row):
+    """Stylers listos para st.dataframe: tabla y fila de totales con formato, sin convertir las columnas a texto."""
+    import pandas as pd
+    
+    if df is None or df.empty:
+        return None, None
+    # El Styler formatea solo al renderizar: las columnas siguen siendo numéricas (y ordenables)
+    vote_cols = [col for col in df.columns if 'Actual' in col or 'Proyectado' in col]
+    vote_formats = {col: '{:,}' for col in vote_cols}
+    table = df.style.format({'Actas %': '{:.1f}%', **vote_formats})
+    totals = pd.DataFrame([total_row]).style.format(vote_formats)
+    return table, totals
+
+def _process_payload(payload_key, data):
+    """Procesar el payload una vez por sesión y archivo de caché; las re-ejecuciones con los mismos datos reutilizan el resultado."""
+    if st.session_state.get('_last_payload_key') == payload_key and '_processed' in st.session_state:
+        return st.session_state._processed
+    
+    mode = data.get('mode', 'DEPARTAMENTOS')
+    summary_modes = ('DEPARTAMENTOS', 'MUNICIPIOS') if mode == 'BOTH' else (mode,)
+    # Las columnas de candidatos y el orden de departamentos se calculan una vez para ambas tablas
+    top_candidates = _top_candidates(payload_key, data)
+    sorted_depts = _sorted_dept_names(frozenset(data.get('departments', ())))
+    
+    processed = {
+        'data_issues': check_data_quality(data),
+        'summaries': {m: generate_projection_summary(payload_key, data, m) for m in summary_modes},
+        'dept': (_styled_tables(*process_department_data(payload_key, data, top_candidates, sorted_depts))
+                 if mode in ("DEPARTAMENTOS", "BOTH") else (None, None)),
+        'mun': (_styled_tables(*process_municipality_data(payload_key, data, top_candidates, sorted_depts))
+                if mode in ("MUNICIPIOS", "BOTH") else (None, None)),
+    }
+    st.session_state._processed = processed
+    st.session_state._last_payload_key = payload_key
+    return processed
 
 def main():
     # Encabezado
@@ -365,21 +480,30 @@ def main():
     auto_refresh = st.sidebar.checkbox("Auto-actualizar", value=True)
     refresh_interval = st.sidebar.slider("Intervalo de actualización (segundos)", 30, 300, REFRESH_INTERVAL, 30)
     
+    st.session_state.last_full_run = time.monotonic()
+    st.session_state.refresh_count = st.session_state.get('refresh_count', 0) + 1
+    
+    # Aviso de nuevos datos escritos por el scraper desde la última ejecución
+    if st.session_state.pop('new_data_at', None) is not None or check_for_new_data():
+        st.toast("🔄 ¡Nuevos datos disponibles!", icon="🔄")
+    
     # Cargar datos
-    data = load_cached_data()
+    data, payload_key = load_cached_data()
     
     if not data:
         st.warning("⚠️ No hay datos disponibles. Por favor ejecuta `python main.py` primero para recolectar datos.")
         st.info("El scraper necesita ejecutarse al menos una vez para llenar el archivo de caché.")
         
         if auto_refresh:
-            with st.spinner("Esperando datos... Revisando de nuevo en 10 segundos"):
-                time.sleep(10)
-                st.rerun()
+            st.caption("Esperando datos... Revisando de nuevo en 10 segundos")
+            _auto_refresh(10)
         return
     
+    # Procesar datos (se reutiliza el resultado mientras el archivo de caché no cambie)
+    processed = _process_payload(payload_key, data)
+    
     # Verificar calidad de datos
-    data_issues = check_data_quality(data)
+    data_issues = processed['data_issues']
     if data_issues:
         st.warning(f"⚠️ Problema de calidad: Los siguientes departamentos tienen 0 votos (pueden necesitar re-scraping): {', '.join(data_issues)}")
     
@@ -406,8 +530,8 @@ def main():
     
     st.divider()
     
-    # Procesar datos
     mode = data.get('mode', 'DEPARTAMENTOS')
+    summaries = processed['summaries']
     
     # Sección de resumen
     st.header(f"📊 Resumen de Proyección Nacional")
@@ -418,17 +542,17 @@ def main():
         
         with tab1:
             st.caption("Proyección calculada sumando las proyecciones individuales de cada DEPARTAMENTO.")
-            summary_dept = generate_projection_summary(data, 'DEPARTAMENTOS')
+            summary_dept = summaries['DEPARTAMENTOS']
             display_summary_metrics(summary_dept, key_prefix="dept")
             
         with tab2:
             st.caption("Proyección calculada sumando las proyecciones individuales de cada MUNICIPIO (Más preciso).")
-            summary_mun = generate_projection_summary(data, 'MUNICIPIOS')
+            summary_mun = summaries['MUNICIPIOS']
             display_summary_metrics(summary_mun, key_prefix="mun")
             
     else:
         # Modo simple (solo uno)
-        summary_data = generate_projection_summary(data, mode)
+        summary_data = summaries[mode]
         display_summary_metrics(summary_data, key_prefix="simple")
     
     st.divider()
@@ -439,66 +563,34 @@ def main():
     
     if show_dept:
         st.header("🗺️ Resultados por Departamento")
-        dept_df, dept_total = process_department_data(data)
+        dept_table, dept_totals = processed['dept']
         
-        if dept_df is not None and not dept_df.empty:
-            # Formatear el dataframe para mostrar
-            display_df = dept_df.copy()
-            
-            # Formatear columna de Actas %
-            display_df['Actas %'] = display_df['Actas %'].apply(lambda x: f"{x:.1f}%" if isinstance(x, (int, float)) else x)
-            
-            # Formatear columnas de votos
-            for col in display_df.columns:
-                if 'Actual' in col or 'Proyectado' in col:
-                    display_df[col] = display_df[col].apply(format_number)
-            
+        if dept_table is not None:
             st.dataframe(
-                display_df,
+                dept_table,
                 hide_index=True,
                 height=600
             )
             
             # Mostrar totales
             st.subheader("📊 Totales (Departamentos)")
-            total_df = pd.DataFrame([dept_total])
-            for col in total_df.columns:
-                if 'Actual' in col or 'Proyectado' in col:
-                    total_df[col] = total_df[col].apply(format_number)
-            
-            st.dataframe(total_df, hide_index=True)
+            st.dataframe(dept_totals, hide_index=True)
             
     if show_mun:
         if show_dept: st.divider()
         st.header("🏙️ Resultados por Municipio")
-        mun_df, mun_total = process_municipality_data(data)
+        mun_table, mun_totals = processed['mun']
         
-        if mun_df is not None and not mun_df.empty:
-            # Formatear el dataframe para mostrar
-            display_mun_df = mun_df.copy()
-            
-            # Formatear columna de Actas %
-            display_mun_df['Actas %'] = display_mun_df['Actas %'].apply(lambda x: f"{x:.1f}%" if isinstance(x, (int, float)) else x)
-            
-            # Formatear columnas de votos
-            for col in display_mun_df.columns:
-                if 'Actual' in col or 'Proyectado' in col:
-                    display_mun_df[col] = display_mun_df[col].apply(format_number)
-            
+        if mun_table is not None:
             st.dataframe(
-                display_mun_df,
+                mun_table,
                 hide_index=True,
                 height=600
             )
             
             # Mostrar totales
             st.subheader("📊 Totales (Municipios)")
-            total_mun_df = pd.DataFrame([mun_total])
-            for col in total_mun_df.columns:
-                if 'Actual' in col or 'Proyectado' in col:
-                    total_mun_df[col] = total_mun_df[col].apply(format_number)
-            
-            st.dataframe(total_mun_df, hide_index=True)
+            st.dataframe(mun_totals, hide_index=True)
     
     st.divider()
     
@@ -507,29 +599,14 @@ def main():
     st.caption("**Fuente de Datos:** CNE Honduras - https://resultadosgenerales2025.cne.hn/")
     st.caption("**Nota:** Ejecuta `python main.py` en una terminal separada para mantener los datos actualizados.")
     
-    # Auto-actualización con cuenta regresiva
+    # Auto-actualización: cada segundo solo se re-ejecuta el fragmento _auto_refresh, no toda la app
     if auto_refresh:
         st.sidebar.divider()
         st.sidebar.subheader("🔄 Estado de Auto-Actualización")
-        
-        # Crear placeholder para cuenta regresiva
-        countdown_placeholder = st.sidebar.empty()
-        progress_placeholder = st.sidebar.empty()
-        
-        for remaining in range(refresh_interval, 0, -1):
-            # Verificar nuevos datos cada segundo
-            if check_for_new_data():
-                countdown_placeholder.success("🔄 ¡Nuevos datos disponibles! Recargando...")
-                time.sleep(0.5)
-                st.rerun()
-            
-            countdown_placeholder.info(f"⏱️ Actualizando en **{remaining}** segundos...")
-            progress_placeholder.progress((refresh_interval - remaining) / refresh_interval)
-            time.sleep(1)
-        
-        countdown_placeholder.success("🔄 Actualizando datos ahora...")
-        time.sleep(0.5)
-        st.rerun()
+        # La cuenta regresiva corre en el navegador: Python envía este HTML una vez por ejecución
+        with st.sidebar:
+            st.iframe(COUNTDOWN_HTML.format(interval=refresh_interval, count=st.session_state.refresh_count), height=70)
+        _auto_refresh(refresh_interval)
 
 if __name__ == "__main__":
     main()
@@ -26,6 +26,7 @@ from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext,
 # Configuration
 BASE_URL = "https://resultadosgenerales2025.cne.hn/results-presentation"
 CACHE_FILE = "last_results.json"
+STATE_DB = "state.db"  # SQLite rendezvous shared with the dashboard (app.py)
 CHECK_INTERVAL = 120  # 2 minutes in seconds
 PAGE_TIMEOUT = 60000  # 60 seconds in milliseconds
 DEBUG_PORT = 9222  # Port for connecting to browser
@@ -277,14 +278,79 @@ def create_stealth_context(browser: Browser) -> BrowserContext:
 '''
 
 
+def _open_state_db():
+    """Open the shared state database (WAL mode) and make sure the kv table exists."""
+    import sqlite3
+    
+    conn = sqlite3.connect(STATE_DB, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT, version INTEGER NOT NULL DEFAULT 0)"
+    )
+    return conn
+
+
+def set_state(key: str, value: str) -> int:
+    """Store a value in the state database, bump its version and return the new version."""
+    conn = _open_state_db()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO kv (key, value, version) VALUES (?, ?, 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, version = kv.version + 1",
+                (key, value),
+            )
+            row = conn.execute("SELECT version FROM kv WHERE key = ?", (key,)).fetchone()
+    finally:
+        conn.close()
+    return row[0]
+
+
+def get_state_version(key: str) -> int:
+    """Return the current version of a key in the state database (0 if missing)."""
+    conn = _open_state_db()
+    try:
+        row = conn.execute("SELECT version FROM kv WHERE key = ?", (key,)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+def poll_scrape_trigger(last_version: int) -> int:
+    """Return the dashboard's trigger version, keeping last_version if the state database is busy or unreadable."""
+    import sqlite3
+    
+    try:
+        return get_state_version('trigger')
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not read the scrape trigger: {e}")
+        return last_version
+
+
 def save_cache(data: dict) -> None:
     """Save results to cache file and signal dashboard to reload."""
     data['cached_at'] = datetime.now().isoformat()
-    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    # Signal dashboard to reload
-    with open('.data_updated', 'w') as f:
-        f.write(datetime.now().isoformat())
+    # Compact JSON (no indent) keeps the payload small for the dashboard's decode;
+    # write to a temp file and swap it in so the dashboard never reads a partial file
+    tmp_file = CACHE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    # On Windows the swap fails while the dashboard has the file open; retry briefly
+    for attempt in range(5):
+        try:
+            os.replace(tmp_file, CACHE_FILE)
+            break
+        except PermissionError:
+            if attempt == 4:
+                raise
+            time.sleep(0.2)
+    # Signal dashboard to reload (best effort: the cache file is already in place)
+    import sqlite3
+    
+    try:
+        set_state('data', data['cached_at'])
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not signal the dashboard: {e}")
 
 
 def save_department_history(department_data: Dict, projection_df: pd.DataFrame) -> None:
@@ -1888,7 +1954,6 @@ def main():
     print("Press Ctrl+C to stop\n")
     
     last_results = load_cache()
-    trigger_file = ".trigger_scrape"
     
     # If we got data in phase 1, process it
     if department_data and 'raw_data' not in department_data:
@@ -1940,93 +2005,102 @@ def main():
             cached_time = last_results.get('cached_at', 'Unknown')
             display_results(cached_df, "OFFLINE", cached_time)
     
-    while True:
-        try:
-            # Check for manual trigger every 5 seconds during wait
-            for _ in range(CHECK_INTERVAL // 5):
-                time.sleep(5)
-                if os.path.exists(trigger_file):
-                    os.remove(trigger_file)
-                    print("\n🔃 Manual scrape requested from dashboard!")
-                    break
+    # The flag tells the dashboard that manual scrapes are being picked up; always cleared on exit
+    set_state('scraper_running', '1')
+    last_trigger = get_state_version('trigger')
+    try:
+        while True:
+            try:
+                # Check for manual trigger every 5 seconds during wait
+                for _ in range(CHECK_INTERVAL // 5):
+                    time.sleep(5)
+                    trigger_version = poll_scrape_trigger(last_trigger)
+                    if trigger_version != last_trigger:
+                        last_trigger = trigger_version
+                        print("\n🔃 Manual scrape requested from dashboard!")
+                        break
             
-            # Scrape data
-            print("\nFetching updated data...")
+                # Scrape data
+                print("\nFetching updated data...")
             
-            # Always use existing browser (Edge/Chrome)
-            department_data = scraper.scrape_with_existing_browser(mode=scrape_mode)
+                # Always use existing browser (Edge/Chrome)
+                department_data = scraper.scrape_with_existing_browser(mode=scrape_mode)
             
-            if department_data and 'raw_data' not in department_data:
-                # Show detailed results based on mode
-                if scrape_mode in ["DEPARTAMENTOS", "BOTH"]:
-                    display_department_results(department_data)
+                if department_data and 'raw_data' not in department_data:
+                    # Show detailed results based on mode
+                    if scrape_mode in ["DEPARTAMENTOS", "BOTH"]:
+                        display_department_results(department_data)
                 
-                if scrape_mode in ["MUNICIPIOS", "BOTH"]:
-                    display_municipio_results(department_data)
+                    if scrape_mode in ["MUNICIPIOS", "BOTH"]:
+                        display_municipio_results(department_data)
                 
-                # Calculate and display projections
-                if scrape_mode == "BOTH":
-                    proj_dept = calculate_national_projection(department_data, mode="DEPARTAMENTOS")
-                    proj_mun = calculate_national_projection(department_data, mode="MUNICIPIOS")
+                    # Calculate and display projections
+                    if scrape_mode == "BOTH":
+                        proj_dept = calculate_national_projection(department_data, mode="DEPARTAMENTOS")
+                        proj_mun = calculate_national_projection(department_data, mode="MUNICIPIOS")
                     
-                    display_results(proj_dept, title="PROJECTION BASED ON DEPARTMENTS")
-                    print("\n")
-                    display_results(proj_mun, title="PROJECTION BASED ON MUNICIPIOS")
+                        display_results(proj_dept, title="PROJECTION BASED ON DEPARTMENTS")
+                        print("\n")
+                        display_results(proj_mun, title="PROJECTION BASED ON MUNICIPIOS")
                     
-                    # Save both
-                    save_department_history(department_data, proj_dept)
-                    save_municipality_history(department_data, proj_mun)
+                        # Save both
+                        save_department_history(department_data, proj_dept)
+                        save_municipality_history(department_data, proj_mun)
                     
-                    projection_df = proj_mun
-                else:
-                    projection_df = calculate_national_projection(department_data, mode=scrape_mode)
-                    display_results(projection_df, title=f"PROJECTION BASED ON {scrape_mode}")
+                        projection_df = proj_mun
+                    else:
+                        projection_df = calculate_national_projection(department_data, mode=scrape_mode)
+                        display_results(projection_df, title=f"PROJECTION BASED ON {scrape_mode}")
                     
-                    if scrape_mode == "DEPARTAMENTOS":
-                        save_department_history(department_data, projection_df)
-                    elif scrape_mode == "MUNICIPIOS":
-                        save_municipality_history(department_data, projection_df)
+                        if scrape_mode == "DEPARTAMENTOS":
+                            save_department_history(department_data, projection_df)
+                        elif scrape_mode == "MUNICIPIOS":
+                            save_municipality_history(department_data, projection_df)
                 
-                if not projection_df.empty:
-                    cache_data = {
-                        'departments': department_data,
-                        'projection': projection_df.to_dict('records'),
-                        'mode': scrape_mode
-                    }
-                    save_cache(cache_data)
-                    # save_historical_data removed here as it is handled above
-                    last_results = cache_data
+                    if not projection_df.empty:
+                        cache_data = {
+                            'departments': department_data,
+                            'projection': projection_df.to_dict('records'),
+                            'mode': scrape_mode
+                        }
+                        save_cache(cache_data)
+                        # save_historical_data removed here as it is handled above
+                        last_results = cache_data
+                    else:
+                        # Use cached data if available
+                        if last_results:
+                            cached_df = pd.DataFrame(last_results.get('projection', []))
+                            cached_time = last_results.get('cached_at', 'Unknown')
+                            display_results(cached_df, "OFFLINE", cached_time)
+                        else:
+                            display_results(pd.DataFrame(), "OFFLINE")
                 else:
-                    # Use cached data if available
+                    # Use cached data
                     if last_results:
                         cached_df = pd.DataFrame(last_results.get('projection', []))
                         cached_time = last_results.get('cached_at', 'Unknown')
                         display_results(cached_df, "OFFLINE", cached_time)
                     else:
                         display_results(pd.DataFrame(), "OFFLINE")
-            else:
+                    
+            except KeyboardInterrupt:
+                print("\n\nStopping scraper...")
+                break
+            except Exception as e:
+                print(f"\n⚠️  Error during scraping: {e}")
+            
                 # Use cached data
                 if last_results:
                     cached_df = pd.DataFrame(last_results.get('projection', []))
                     cached_time = last_results.get('cached_at', 'Unknown')
                     display_results(cached_df, "OFFLINE", cached_time)
                 else:
-                    display_results(pd.DataFrame(), "OFFLINE")
-                    
-        except KeyboardInterrupt:
-            print("\n\nStopping scraper...")
-            break
+                    print("No cached data available.")
+    finally:
+        try:
+            set_state('scraper_running', '0')
         except Exception as e:
-            print(f"\n⚠️  Error during scraping: {e}")
-            
-            # Use cached data
-            if last_results:
-                cached_df = pd.DataFrame(last_results.get('projection', []))
-                cached_time = last_results.get('cached_at', 'Unknown')
-                display_results(cached_df, "OFFLINE", cached_time)
-            else:
-                print("No cached data available.")
-        
+            print(f"⚠️  Could not clear the running flag: {e}")
     print("Scraper stopped. Goodbye!")
 
 